@@ -7,13 +7,14 @@ from typing import Optional
 
 import env
 from config.log import setup_logging, get_logger
+from core.admission import admission_stats
 from core.exceptions import (
     APIException,
     api_exception_handler,
     general_exception_handler,
 )
 from core.response import success_response, APIResponse
-from routers import llm, files, audio, secrets
+from routers import llm, files, audio, secrets, transcripts
 
 # 设置日志
 setup_logging(log_level="INFO")
@@ -69,6 +70,11 @@ app.include_router(
 app.include_router(
     audio.router, prefix="/api/v1", dependencies=[Depends(verify_web_access_password)]
 )
+app.include_router(
+    transcripts.router,
+    prefix="/api/v1",
+    dependencies=[Depends(verify_web_access_password)],
+)
 
 app.include_router(
     secrets.router, prefix="/api/v1", dependencies=[Depends(verify_web_access_password)]
@@ -85,6 +91,14 @@ async def health_check():
     )
 
 
+@app.get("/metrics/admission", response_model=APIResponse)
+async def admission_metrics():
+    """上游并发准入监控接口(队列深度/等待时间)"""
+    return success_response(
+        data=admission_stats(), message="Admission metrics retrieved successfully"
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -0,0 +1,151 @@
+# -*- coding: UTF-8 -*-
+"""AUC 查询结果解析基准测试: 整体 json 解析 vs 流式解析
+
+每种解析方式在独立子进程中运行, 以便分别统计峰值 RSS.
+
+用法: python benchmarks/bench_asr_parse.py [--hours 4]
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.asr import parse_auc_query_response  # noqa: E402
+
+CHUNK_SIZE = 64 * 1024
+_CHARS = [chr(code) for code in range(0x4E00, 0x4E00 + 3000)]
+
+
+def generate_payload(path: str, hours: float, seed: int = 42) -> int:
+    """生成模拟 AUC 查询响应(含 words 字段), 返回句子数"""
+    rng = random.Random(seed)
+    utterances = []
+    current = 0
+    while current < hours * 3600 * 1000:
+        duration = rng.randint(2000, 5000)
+        text = "".join(rng.choice(_CHARS) for _ in range(rng.randint(8, 30)))
+        step = duration // len(text)
+        words = [
+            {
+                "text": char,
+                "start_time": current + i * step,
+                "end_time": current + (i + 1) * step,
+                "confidence": 0,
+            }
+            for i, char in enumerate(text)
+        ]
+        utterances.append(
+            {
+                "text": text,
+                "start_time": current,
+                "end_time": current + duration,
+                "words": words,
+                "additions": {"speaker": "1"},
+            }
+        )
+        current += duration + rng.randint(0, 800)
+
+    payload = {
+        "resp": {
+            "id": "benchmark",
+            "code": 1000,
+            "message": "success",
+            "text": "".join(utterance["text"] for utterance in utterances),
+            "utterances": utterances,
+        }
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False)
+    return len(utterances)
+
+
+def _read_chunks(path: str):
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+def parse_full(path: str):
+    """原实现: 读取完整响应体后 json 解析, 再复制为 dict 列表"""
+    resp = json.loads(b"".join(_read_chunks(path)))
+    return [
+        {
+            "start_time": utterance["start_time"],
+            "end_time": utterance["end_time"],
+            "text": utterance["text"],
+        }
+        for utterance in resp["resp"]["utterances"]
+    ]
+
+
+def parse_stream(path: str):
+    """新实现: 分块流式解析, 只保留紧凑的句子列表"""
+    _, _, utterances = parse_auc_query_response(_read_chunks(path))
+    return utterances
+
+
+def _max_rss_mib() -> float:
+    # Linux 下 ru_maxrss 单位为 KiB, macOS 下为字节
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024
+
+
+def run_mode(mode: str, path: str):
+    baseline = _max_rss_mib()
+    start = time.perf_counter()
+    result = (parse_full if mode == "full" else parse_stream)(path)
+    elapsed = time.perf_counter() - start
+    peak = _max_rss_mib()
+    print(
+        f"{mode:<8} utterances={len(result)} parse={elapsed:.2f}s "
+        f"peak_rss={peak:.1f}MiB (+{peak - baseline:.1f}MiB)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark AUC response parsing")
+    parser.add_argument("--hours", type=float, default=4)
+    parser.add_argument("--mode", choices=["generate", "full", "stream"])
+    parser.add_argument("--payload")
+    args = parser.parse_args()
+
+    if args.mode == "generate":
+        count = generate_payload(args.payload, args.hours)
+        size = os.path.getsize(args.payload) / 1024 / 1024
+        print(f"payload: {args.hours}h, {count} utterances, {size:.1f} MiB")
+        return
+    if args.mode:
+        run_mode(args.mode, args.payload)
+        return
+
+    # 生成数据也放到子进程中, 避免 fork 出的子进程继承父进程的峰值 RSS
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "auc_query.json")
+        for mode in ("generate", "full", "stream"):
+            subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    "--mode",
+                    mode,
+                    "--payload",
+                    path,
+                    "--hours",
+                    str(args.hours),
+                ],
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# -*- coding: UTF-8 -*-
+"""转写检索索引基准测试
+
+用法: python benchmarks/bench_retrieval.py [--utterances 10000] [--queries 200]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.retrieval import BM25Index, build_segments  # noqa: E402
+
+# 3000 个常用区汉字, 按 Zipf 分布采样以模拟自然语言词频
+_CHARS = [chr(code) for code in range(0x4E00, 0x4E00 + 3000)]
+_WEIGHTS = [1 / (rank + 1) for rank in range(len(_CHARS))]
+
+
+def generate_utterances(count: int, seed: int = 42) -> list:
+    """生成模拟转写句子, 每句 2-5 秒, 8-30 字"""
+    rng = random.Random(seed)
+    utterances = []
+    current = 0
+    for _ in range(count):
+        duration = rng.randint(2000, 5000)
+        text = "".join(rng.choices(_CHARS, weights=_WEIGHTS, k=rng.randint(8, 30)))
+        utterances.append(
+            {"start_time": current, "end_time": current + duration, "text": text}
+        )
+        current += duration + rng.randint(0, 800)
+    return utterances
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark transcript BM25 index")
+    parser.add_argument("--utterances", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    utterances = generate_utterances(args.utterances)
+    rng = random.Random(7)
+    queries = [
+        rng.choice(utterances)["text"][: rng.randint(4, 12)]
+        for _ in range(args.queries)
+    ]
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    index = BM25Index(build_segments(utterances))
+    build_ms = (time.perf_counter() - start) * 1000
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, top_k=args.top_k)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+
+    print(f"utterances:        {len(utterances)}")
+    print(f"segments:          {len(index.segments)}")
+    print(f"vocabulary:        {len(index.postings)}")
+    print(f"build time:        {build_ms:.1f} ms")
+    print(f"index memory:      {current / 1024 / 1024:.2f} MiB")
+    print(f"build peak memory: {peak / 1024 / 1024:.2f} MiB")
+    print(f"query p50:         {latencies[len(latencies) // 2]:.3f} ms")
+    print(f"query p99:         {latencies[int(len(latencies) * 0.99) - 1]:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,3 +13,15 @@ class AsrTaskStatus(enum.Enum):
     RUNNING = "running"
     FINISHED = "finished"
     FAILED = "failed"
+
+
+class TranscriptionResultFormat(enum.Enum):
+    ROWS = "rows"
+    COLUMNS = "columns"
+
+
+class RequestPriority(enum.IntEnum):
+    """上游准入优先级, 数值越小越优先"""
+
+    INTERACTIVE = 0
+    BULK = 1
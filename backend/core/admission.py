@@ -0,0 +1,191 @@
+# -*- coding: UTF-8 -*-
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import env
+from config.log import get_logger
+from constants import RequestPriority
+from core.exceptions import OverloadedException
+
+logger = get_logger(__name__)
+
+
+class AdmissionController:
+    """单个上游服务的并发准入控制
+
+    - 最多 max_concurrency 个请求同时访问上游
+    - 超出的请求进入按优先级排序的有界等待队列, 队列满时直接拒绝(503)
+    - 排队超过 max_wait 秒仍未获得执行槽位时拒绝(429)
+    - Retry-After 根据最近的槽位占用时间估算, 而不是固定值
+    """
+
+    def __init__(
+        self, name: str, max_concurrency: int, max_queue: int, max_wait: float
+    ):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+
+        self._active = 0
+        # 等待队列: (优先级, 序号, future), 优先级数值越小越先执行
+        self._waiters = []
+        self._counter = itertools.count()
+
+        self._admitted = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._total_wait = 0.0
+        self._max_wait_seen = 0.0
+        # 最近槽位占用时长/排队时长的指数滑动平均(秒), 用于估算 Retry-After
+        self._avg_hold = None
+        self._avg_wait = None
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    @staticmethod
+    def _ewma(average: Optional[float], sample: float) -> float:
+        return sample if average is None else average * 0.8 + sample * 0.2
+
+    def _drain_retry_after(self) -> int:
+        """队列满(503): 按平均占用时长估算排空当前队列所需时间"""
+        if self._avg_hold is None:
+            return max(1, math.ceil(self.max_wait))
+        rounds = (self.queued + 1) / max(1, self.max_concurrency)
+        return max(1, math.ceil(rounds * self._avg_hold))
+
+    def _timeout_retry_after(self) -> int:
+        """排队超时(429): 参考最近请求实际的排队时长, 上限为 max_wait"""
+        if self._avg_wait is None:
+            return max(1, math.ceil(self.max_wait / 2))
+        return max(1, min(math.ceil(self._avg_wait), math.ceil(self.max_wait)))
+
+    def _discard(self, entry: tuple) -> None:
+        """将超时/取消的等待者移出队列, 保证队列长度不超过 max_queue"""
+        try:
+            self._waiters.remove(entry)
+        except ValueError:
+            return
+        heapq.heapify(self._waiters)
+
+    async def acquire(self, priority: RequestPriority) -> None:
+        """获取执行槽位, 必要时按优先级排队等待"""
+        if self._active < self.max_concurrency and not self.queued:
+            self._active += 1
+            self._admitted += 1
+            return
+
+        if self.queued >= self.max_queue:
+            self._rejected += 1
+            logger.warning(f"{self.name} queue is full, rejecting request")
+            raise OverloadedException(
+                self.name,
+                status_code=503,
+                reason="queue is full",
+                retry_after=self._drain_retry_after(),
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (priority.value, next(self._counter), waiter)
+        heapq.heappush(self._waiters, entry)
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # 超时的同时恰好被唤醒, 已占用槽位, 直接放行
+                pass
+            else:
+                waiter.cancel()
+                self._discard(entry)
+                self._timed_out += 1
+                logger.warning(f"{self.name} queue wait timed out, rejecting request")
+                raise OverloadedException(
+                    self.name,
+                    status_code=429,
+                    reason="queue wait timed out",
+                    retry_after=self._timeout_retry_after(),
+                )
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                waiter.cancel()
+                self._discard(entry)
+            raise
+
+        wait = time.monotonic() - start
+        self._admitted += 1
+        self._total_wait += wait
+        self._max_wait_seen = max(self._max_wait_seen, wait)
+        self._avg_wait = self._ewma(self._avg_wait, wait)
+
+    def release(self) -> None:
+        """释放执行槽位, 并唤醒优先级最高的等待者"""
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                # 槽位直接移交给等待者, 活跃数不变
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    @asynccontextmanager
+    async def slot(self, priority: RequestPriority = RequestPriority.BULK):
+        await self.acquire(priority)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._avg_hold = self._ewma(self._avg_hold, time.monotonic() - start)
+            self.release()
+
+    def stats(self) -> dict:
+        """队列深度与等待时间统计, 用于监控"""
+        return {
+            "active": self._active,
+            "queued": self.queued,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "admitted": self._admitted,
+            "rejected": self._rejected,
+            "timed_out": self._timed_out,
+            "avg_wait_ms": round(self._total_wait / self._admitted * 1000, 2)
+            if self._admitted
+            else 0.0,
+            "max_wait_ms": round(self._max_wait_seen * 1000, 2),
+        }
+
+
+AUC_LIMITER = AdmissionController(
+    "Volcengine ASR",
+    max_concurrency=env.AUC_MAX_CONCURRENCY,
+    max_queue=env.AUC_MAX_QUEUE,
+    max_wait=env.ADMISSION_MAX_WAIT,
+)
+LLM_LIMITER = AdmissionController(
+    "LLM",
+    max_concurrency=env.LLM_MAX_CONCURRENCY,
+    max_queue=env.LLM_MAX_QUEUE,
+    max_wait=env.ADMISSION_MAX_WAIT,
+)
+S3_LIMITER = AdmissionController(
+    "TOS",
+    max_concurrency=env.STORAGE_MAX_CONCURRENCY,
+    max_queue=env.STORAGE_MAX_QUEUE,
+    max_wait=env.ADMISSION_MAX_WAIT,
+)
+
+
+def admission_stats() -> dict:
+    return {
+        limiter.name: limiter.stats()
+        for limiter in (AUC_LIMITER, LLM_LIMITER, S3_LIMITER)
+    }
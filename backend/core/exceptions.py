@@ -17,8 +17,9 @@ class APIException(HTTPException):
         message: str,
         error_code: str = None,
         details: Union[str, dict] = None,
+        headers: dict = None,
     ):
-        super().__init__(status_code=status_code, detail=message)
+        super().__init__(status_code=status_code, detail=message, headers=headers)
         self.message = message
         self.error_code = error_code or f"API_ERROR_{status_code}"
         self.details = details
@@ -52,6 +53,21 @@ class ExternalServiceException(APIException):
         )
 
 
+class OverloadedException(APIException):
+    """上游服务过载异常"""
+
+    def __init__(
+        self, service_name: str, status_code: int, reason: str, retry_after: int
+    ):
+        super().__init__(
+            status_code=status_code,
+            message=f"{service_name} is overloaded: {reason}",
+            error_code="SERVICE_OVERLOADED",
+            details={"service": service_name, "retry_after": retry_after},
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
 async def api_exception_handler(request: Request, exc: APIException) -> JSONResponse:
     """API异常处理器"""
     logger.error(
@@ -68,6 +84,7 @@ async def api_exception_handler(request: Request, exc: APIException) -> JSONResp
 
     return JSONResponse(
         status_code=exc.status_code,
+        headers=exc.headers,
         content={
             "success": False,
             "error": {
@@ -14,3 +14,18 @@ AUC_APP_ID = os.getenv("AUC_APP_ID")
 AUC_ACCESS_TOKEN = os.getenv("AUC_ACCESS_TOKEN")
 AUC_CLUSTER_ID = os.getenv("AUC_CLUSTER_ID", None)
 WEB_ACCESS_PASSWORD = os.getenv("WEB_ACCESS_PASSWORD", None)
+TRANSCRIPT_INDEX_CACHE_SIZE = int(os.getenv("TRANSCRIPT_INDEX_CACHE_SIZE", 32))
+TRANSCRIPT_SEGMENT_WINDOW_MS = int(os.getenv("TRANSCRIPT_SEGMENT_WINDOW_MS", 30000))
+AUC_MAX_CONCURRENCY = int(os.getenv("AUC_MAX_CONCURRENCY", 8))
+AUC_MAX_QUEUE = int(os.getenv("AUC_MAX_QUEUE", 64))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", 32))
+STORAGE_MAX_CONCURRENCY = int(os.getenv("STORAGE_MAX_CONCURRENCY", 16))
+STORAGE_MAX_QUEUE = int(os.getenv("STORAGE_MAX_QUEUE", 64))
+ADMISSION_MAX_WAIT = float(os.getenv("ADMISSION_MAX_WAIT", 30))
+ASR_SPLIT_ENABLED = os.getenv("ASR_SPLIT_ENABLED", "true").lower() == "true"
+ASR_CHUNK_DURATION = int(os.getenv("ASR_CHUNK_DURATION", 600))
+ASR_MAX_CHUNKS = int(os.getenv("ASR_MAX_CHUNKS", 8))
+ASR_SPLIT_TIMEOUT = float(os.getenv("ASR_SPLIT_TIMEOUT", 120))
+# 组合任务ID的签名密钥, 多个 worker 需保持一致, 默认复用对象存储密钥
+TASK_ID_SECRET = os.getenv("TASK_ID_SECRET") or STORAGE_SECRET_KEY
@@ -1,8 +1,11 @@
 # -*- coding: UTF-8 -*-
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional, Any
 
+# 转写检索单次最多返回的片段数
+MAX_TOP_K = 50
+
 
 class MessageModel(BaseModel):
     role: str
@@ -15,12 +18,29 @@ class ChatRequest(BaseModel):
     temperature: Optional[float] = None
     max_tokens: Optional[int]
     timeout: Optional[int]
+    audio_md5: Optional[str] = None
+    top_k: int = Field(5, ge=1, le=MAX_TOP_K)
 
 
 class FileNameRequest(BaseModel):
     filename: str
 
 
+class UtteranceModel(BaseModel):
+    start_time: int
+    end_time: int
+    text: str
+
+
+class TranscriptIndexRequest(BaseModel):
+    utterances: List[UtteranceModel]
+
+
+class TranscriptSearchRequest(BaseModel):
+    query: str
+    top_k: int = Field(5, ge=1, le=MAX_TOP_K)
+
+
 class EnvResponse(BaseModel):
     code: int = 200
     success: bool = True
@@ -1,22 +1,67 @@
 # -*- coding: UTF-8 -*-
-from fastapi import APIRouter
+from fastapi import APIRouter, BackgroundTasks, Query
+from fastapi.concurrency import run_in_threadpool
+import asyncio
 import hashlib
 import json
+import mmap
+import os
+import re
+import tempfile
+import threading
 import uuid
+from typing import List, Optional, Tuple
 import requests
 from throttled import Throttled, per_sec, MemoryStore
 
-from constants import VolcengineASRResponseStatusCode, AsrTaskStatus
+from constants import (
+    VolcengineASRResponseStatusCode,
+    AsrTaskStatus,
+    RequestPriority,
+    TranscriptionResultFormat,
+)
 from models import FileNameRequest
-from core.exceptions import BusinessException, ExternalServiceException
+from core.admission import AUC_LIMITER, S3_LIMITER
+from core.exceptions import APIException, BusinessException, ExternalServiceException
 from core.response import success_response, APIResponse
 from config.log import get_logger
 import env
-from utils.s3 import generate_download_url
+from utils.asr import (
+    UtteranceList,
+    decode_chunked_task_id,
+    encode_chunked_task_id,
+    parse_auc_query_response,
+)
+from utils.s3 import (
+    delete_files,
+    download_file,
+    generate_download_url,
+    head_file_size,
+    read_file_range,
+    upload_bytes,
+)
+from utils.vad import (
+    chunk_bytes,
+    chunk_offset_ms,
+    detect_silences,
+    estimate_duration_ms,
+    id3_size,
+    plan_chunks,
+    scan_mp3_frames,
+)
 
 router = APIRouter(prefix="/audio", tags=["Audio"])
 logger = get_logger(__name__)
 STORE = MemoryStore()
+# 流式读取 AUC 响应时的分块大小
+QUERY_CHUNK_SIZE = 64 * 1024
+# 切分后的分片统一存放在该前缀下, 任务结束后删除, 也可对该前缀配置生命周期规则兜底
+ASR_CHUNK_PREFIX = "asr-chunks/"
+ASR_CHUNK_NAME = re.compile(
+    re.escape(ASR_CHUNK_PREFIX) + r"[^\x00-\x1f]+\.[0-9a-f]{32}\.part\d+\.mp3"
+)
+# 估算音频时长时读取的文件开头字节数
+PROBE_SIZE = 64 * 1024
 
 
 def generate_local_uuid():
@@ -27,50 +72,238 @@ def generate_local_uuid():
     return md5_obj.hexdigest()
 
 
-@router.post("/transcription-tasks", response_model=APIResponse)
-async def create_transcription_task(request: FileNameRequest):
-    """创建音频转写任务
+async def submit_auc_task(filename: str) -> str:
+    """提交单个 AUC 转写任务, 返回任务ID"""
+    submit_url = "https://openspeech.bytedance.com/api/v1/auc/submit"
+    download_url = generate_download_url(filename)
 
-    RESTful路径: POST /api/v1/audio/transcription-tasks
+    data = {
+        "app": {
+            "appid": env.AUC_APP_ID,
+            "token": env.AUC_ACCESS_TOKEN,
+            "cluster": env.AUC_CLUSTER_ID,
+        },
+        "user": {
+            "uid": generate_local_uuid(),
+        },
+        "audio": {"format": "mp3", "url": download_url},
+        "request": {"model_name": "bigmodel", "enable_itn": True},
+    }
+
+    headers = {
+        "Authorization": f"Bearer; {env.AUC_ACCESS_TOKEN}",
+    }
+
+    async with AUC_LIMITER.slot(RequestPriority.BULK):
+        with Throttled(
+            key=env.AUC_APP_ID, store=STORE, quota=per_sec(limit=100, burst=100)
+        ):
+            response = await run_in_threadpool(
+                requests.post, submit_url, data=json.dumps(data), headers=headers
+            )
+
+    response.raise_for_status()
+    resp = response.json()
+
+    if resp["resp"]["message"] != "success":
+        logger.error(f"ASR service returned error: {resp}")
+        raise ExternalServiceException(
+            "Volcengine ASR", f"Submit task failed: {resp['resp']['message']}"
+        )
+
+    return resp["resp"]["id"]
+
+
+def estimate_audio_duration(filename: str) -> Optional[int]:
+    """只读取文件大小和开头部分估算音频时长(毫秒), 无法估算时返回 None"""
+    size = head_file_size(filename)
+    head = read_file_range(filename, 0, PROBE_SIZE)
+    offset = id3_size(head)
+    if len(head) - offset < PROBE_SIZE // 2 and size > len(head):
+        # ID3 标签(如封面图片)较大, 从标签之后重新读取
+        head = read_file_range(filename, offset, PROBE_SIZE)
+    else:
+        head = head[offset:]
+    return estimate_duration_ms(head, size - offset)
+
+
+def split_audio(
+    filename: str, cancelled: Optional[threading.Event] = None
+) -> List[Tuple[str, int]]:
+    """在静音处切分长音频并上传各分片
+
+    :param cancelled: 调用方超时后置位, 停止上传并删除已上传的分片
+    :return: [(分片文件名, 分片在原音频中的起始毫秒)], 无需切分时返回空列表
     """
-    logger.info(f"Creating transcription task for file: {request.filename}")
 
+    def aborted(parts: List[Tuple[str, int]]) -> bool:
+        if cancelled is None or not cancelled.is_set():
+            return False
+        if parts:
+            delete_files([part_name for part_name, _ in parts])
+        logger.warning(f"Splitting {filename} cancelled, {len(parts)} chunks removed")
+        return True
+
+    with tempfile.TemporaryFile() as f:
+        download_file(filename, f)
+        f.flush()
+        if not f.tell() or aborted([]):
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            frames = scan_mp3_frames(data)
+            if not len(frames):
+                return []
+            # 分片数不超过 ASR_MAX_CHUNKS, 超长音频相应增大分片时长
+            target_ms = max(
+                env.ASR_CHUNK_DURATION * 1000, frames.duration_ms // env.ASR_MAX_CHUNKS
+            )
+            chunks = plan_chunks(
+                frames,
+                detect_silences(frames),
+                target_ms=target_ms,
+                max_ms=target_ms * 3 // 2,
+                max_chunks=env.ASR_MAX_CHUNKS,
+            )
+            if len(chunks) > env.ASR_MAX_CHUNKS:
+                raise RuntimeError(
+                    f"planned {len(chunks)} chunks, exceeds ASR_MAX_CHUNKS "
+                    f"{env.ASR_MAX_CHUNKS}"
+                )
+            if len(chunks) <= 1:
+                return []
+
+            # 同一文件可能同时存在多个转写任务, 分片名加入随机串避免互相覆盖或误删
+            stem = f"{os.path.splitext(filename)[0]}.{uuid.uuid4().hex}"
+            parts = []
+            try:
+                for index, chunk in enumerate(chunks):
+                    if aborted(parts):
+                        return []
+                    part_name = f"{ASR_CHUNK_PREFIX}{stem}.part{index}.mp3"
+                    upload_bytes(part_name, chunk_bytes(data, frames, chunk))
+                    parts.append((part_name, chunk_offset_ms(frames, chunk)))
+            except Exception:
+                # 上传中途失败时删除已上传的分片, 再交由调用方退化为整段转写
+                if parts:
+                    try:
+                        delete_files([part_name for part_name, _ in parts])
+                    except Exception as e:
+                        logger.warning(
+                            f"Failed to delete audio chunks of {filename}: {str(e)}"
+                        )
+                raise
+            if aborted(parts):
+                return []
+
+    logger.info(
+        f"Split {filename} ({frames.duration_ms} ms) into {len(parts)} chunks "
+        f"at offsets {[offset for _, offset in parts]}"
+    )
+    return parts
+
+
+async def delete_parts(part_names: List[str]):
+    """删除切分产生的分片文件, 失败时仅记录日志"""
     try:
-        submit_url = "https://openspeech.bytedance.com/api/v1/auc/submit"
-        download_url = generate_download_url(request.filename)
-
-        data = {
-            "app": {
-                "appid": env.AUC_APP_ID,
-                "token": env.AUC_ACCESS_TOKEN,
-                "cluster": env.AUC_CLUSTER_ID,
-            },
-            "user": {
-                "uid": generate_local_uuid(),
-            },
-            "audio": {"format": "mp3", "url": download_url},
-            "request": {"model_name": "bigmodel", "enable_itn": True},
-        }
-
-        headers = {
-            "Authorization": f"Bearer; {env.AUC_ACCESS_TOKEN}",
-        }
+        async with S3_LIMITER.slot(RequestPriority.BULK):
+            await run_in_threadpool(delete_files, part_names)
+        logger.info(f"Deleted {len(part_names)} audio chunks")
+    except Exception as e:
+        logger.warning(f"Failed to delete audio chunks {part_names}: {str(e)}")
 
-        with Throttled(
-            key=env.AUC_APP_ID, store=STORE, quota=per_sec(limit=100, burst=100)
-        ):
-            response = requests.post(submit_url, data=json.dumps(data), headers=headers)
 
-        response.raise_for_status()
-        resp = response.json()
+def log_abandoned_split(task: asyncio.Future):
+    """记录超时放弃后仍在运行的切分任务的最终异常"""
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Abandoned audio split failed: {str(task.exception())}")
+
 
-        if resp["resp"]["message"] != "success":
-            logger.error(f"ASR service returned error: {resp}")
-            raise ExternalServiceException(
-                "Volcengine ASR", f"Submit task failed: {resp['resp']['message']}"
+async def submit_chunked_task(
+    filename: str, background_tasks: BackgroundTasks
+) -> Optional[str]:
+    """切分长音频并并行提交各分片, 返回组合任务ID
+
+    音频较短、切分超时或任一分片提交失败时返回 None, 由调用方退化为整段转写
+    """
+    try:
+        async with S3_LIMITER.slot(RequestPriority.BULK):
+            duration_ms = await run_in_threadpool(estimate_audio_duration, filename)
+        if duration_ms is not None and duration_ms <= env.ASR_CHUNK_DURATION * 1000:
+            return None
+
+        cancelled = threading.Event()
+
+        async def run_split() -> List[Tuple[str, int]]:
+            # 槽位由该任务持有到线程真正退出, 超时放弃后存储并发也不会超出上限
+            async with S3_LIMITER.slot(RequestPriority.BULK):
+                if cancelled.is_set():
+                    return []
+                return await run_in_threadpool(split_audio, filename, cancelled)
+
+        split_task = asyncio.ensure_future(run_split())
+        try:
+            parts = await asyncio.wait_for(
+                asyncio.shield(split_task), timeout=env.ASR_SPLIT_TIMEOUT
+            )
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            # 线程无法被中断, 由 split_audio 自行停止并清理已上传的分片
+            cancelled.set()
+            split_task.add_done_callback(log_abandoned_split)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            logger.warning(
+                f"Splitting {filename} exceeded {env.ASR_SPLIT_TIMEOUT}s, giving up"
             )
+            return None
+    except APIException:
+        raise
+    except Exception as e:
+        logger.warning(f"Failed to split {filename}: {str(e)}")
+        return None
+
+    if not parts:
+        return None
+
+    results = await asyncio.gather(
+        *(submit_auc_task(part_name) for part_name, _ in parts),
+        return_exceptions=True,
+    )
+    part_names = [part_name for part_name, _ in parts]
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        # 已提交的分片任务无法撤销, 直接丢弃; 删除分片后改为整段转写
+        logger.warning(
+            f"Failed to submit {len(errors)}/{len(parts)} chunks of {filename}, "
+            f"falling back to a single task: {str(errors[0])}"
+        )
+        background_tasks.add_task(delete_parts, part_names)
+        return None
 
-        task_id = resp["resp"]["id"]
+    return encode_chunked_task_id(
+        [
+            (chunk_task_id, offset_ms, part_name)
+            for chunk_task_id, (part_name, offset_ms) in zip(results, parts)
+        ]
+    )
+
+
+@router.post("/transcription-tasks", response_model=APIResponse)
+async def create_transcription_task(
+    request: FileNameRequest, background_tasks: BackgroundTasks
+):
+    """创建音频转写任务
+
+    RESTful路径: POST /api/v1/audio/transcription-tasks
+    长音频会先在静音处切分, 各分片并行提交转写, 返回组合任务ID
+    """
+    logger.info(f"Creating transcription task for file: {request.filename}")
+
+    try:
+        task_id = None
+        if env.ASR_SPLIT_ENABLED:
+            task_id = await submit_chunked_task(request.filename, background_tasks)
+        if task_id is None:
+            task_id = await submit_auc_task(request.filename)
 
         logger.info(f"Transcription task created successfully with ID: {task_id}")
 
@@ -78,6 +311,8 @@ async def create_transcription_task(request: FileNameRequest):
             data={"task_id": task_id}, message="Transcription task created successfully"
         )
 
+    except APIException:
+        raise
     except requests.RequestException as e:
         logger.error(f"Request failed when creating transcription task: {str(e)}")
         raise ExternalServiceException("Volcengine ASR", f"Request failed: {str(e)}")
@@ -86,47 +321,120 @@ async def create_transcription_task(request: FileNameRequest):
         raise BusinessException(f"Failed to create transcription task: {str(e)}")
 
 
-@router.get("/transcription-tasks/{task_id}", response_model=APIResponse)
-async def get_transcription_task(task_id: str):
-    """获取音频转写任务状态
+def query_auc_task(query_url: str, data: dict, headers: dict):
+    """查询 AUC 任务, 流式解析响应体, 避免一次性加载完整结果"""
+    with requests.post(
+        query_url, json.dumps(data), headers=headers, stream=True
+    ) as response:
+        response.raise_for_status()
+        return parse_auc_query_response(
+            response.iter_content(chunk_size=QUERY_CHUNK_SIZE)
+        )
 
-    RESTful路径: GET /api/v1/audio/transcription-tasks/{task_id}
-    """
-    logger.info(f"Querying transcription task status: {task_id}")
 
-    try:
-        data = {
-            "appid": env.AUC_APP_ID,
-            "token": env.AUC_ACCESS_TOKEN,
-            "cluster": env.AUC_CLUSTER_ID,
-            "id": task_id,
-        }
-        query_url = "https://openspeech.bytedance.com/api/v1/auc/query"
+async def query_transcription(task_id: str) -> Tuple[int, Optional[UtteranceList]]:
+    """查询单个 AUC 任务, 返回 (状态码, 转写结果), 仅成功时转写结果不为 None"""
+    data = {
+        "appid": env.AUC_APP_ID,
+        "token": env.AUC_ACCESS_TOKEN,
+        "cluster": env.AUC_CLUSTER_ID,
+        "id": task_id,
+    }
+    query_url = "https://openspeech.bytedance.com/api/v1/auc/query"
 
-        headers = {
-            "Authorization": f"Bearer; {env.AUC_ACCESS_TOKEN}",
-        }
+    headers = {
+        "Authorization": f"Bearer; {env.AUC_ACCESS_TOKEN}",
+    }
 
+    async with AUC_LIMITER.slot(RequestPriority.INTERACTIVE):
         with Throttled(
             key=env.AUC_APP_ID, store=STORE, quota=per_sec(limit=100, burst=100)
         ):
-            response = requests.post(query_url, json.dumps(data), headers=headers)
+            code, _, utterances = await run_in_threadpool(
+                query_auc_task, query_url, data, headers
+            )
+    if code == VolcengineASRResponseStatusCode.SUCCESS.value and utterances is None:
+        # 识别成功但没有任何语音时响应中不含 utterances
+        utterances = UtteranceList()
+    return code, utterances
+
+
+async def query_chunked_transcription(
+    chunks: List[Tuple[str, int, str]]
+) -> Tuple[int, Optional[UtteranceList]]:
+    """并行查询各分片任务, 全部完成后按起始时间拼接结果"""
+    results = await asyncio.gather(
+        *(query_transcription(chunk_task_id) for chunk_task_id, _, _ in chunks)
+    )
+
+    running = [
+        VolcengineASRResponseStatusCode.PENDING.value,
+        VolcengineASRResponseStatusCode.RUNNING.value,
+    ]
+    for code, _ in results:
+        if (
+            code != VolcengineASRResponseStatusCode.SUCCESS.value
+            and code not in running
+        ):
+            return code, None
+    for code, _ in results:
+        if code in running:
+            return code, None
+
+    merged = UtteranceList()
+    for (_, utterances), (_, offset_ms, _) in zip(results, chunks):
+        merged.extend(utterances, offset_ms)
+    return VolcengineASRResponseStatusCode.SUCCESS.value, merged
 
-        response.raise_for_status()
-        resp = response.json()
 
-        code = resp["resp"]["code"]
+@router.get("/transcription-tasks/{task_id}", response_model=APIResponse)
+async def get_transcription_task(
+    task_id: str,
+    background_tasks: BackgroundTasks,
+    result_format: TranscriptionResultFormat = Query(
+        TranscriptionResultFormat.ROWS, alias="format"
+    ),
+):
+    """获取音频转写任务状态
+
+    RESTful路径: GET /api/v1/audio/transcription-tasks/{task_id}
+    可选参数 format=columns 时按列返回结果, 减小响应体积
+    组合任务完成或失败后, 在响应返回后删除切分产生的分片文件
+    """
+    logger.info(f"Querying transcription task status: {task_id}")
+
+    try:
+        try:
+            chunks = decode_chunked_task_id(task_id)
+            # 签名之外再校验一次, 只允许删除切分产生的分片文件
+            if chunks and not all(
+                ASR_CHUNK_NAME.fullmatch(part_name) for _, _, part_name in chunks
+            ):
+                raise ValueError("unexpected chunk name")
+        except ValueError as e:
+            logger.warning(f"Rejected invalid transcription task ID {task_id}: {e}")
+            raise APIException(
+                status_code=400,
+                message="Invalid transcription task ID",
+                error_code="INVALID_TASK_ID",
+            )
+        if chunks:
+            code, utterances = await query_chunked_transcription(chunks)
+            if code not in [
+                VolcengineASRResponseStatusCode.PENDING.value,
+                VolcengineASRResponseStatusCode.RUNNING.value,
+            ]:
+                background_tasks.add_task(
+                    delete_parts, [part_name for _, _, part_name in chunks]
+                )
+        else:
+            code, utterances = await query_transcription(task_id)
 
         if code == VolcengineASRResponseStatusCode.SUCCESS.value:
-            utterances = resp["resp"]["utterances"]
-            result = [
-                {
-                    "start_time": utterance["start_time"],
-                    "end_time": utterance["end_time"],
-                    "text": utterance["text"],
-                }
-                for utterance in utterances
-            ]
+            if result_format == TranscriptionResultFormat.COLUMNS:
+                result = utterances.to_columns()
+            else:
+                result = utterances.to_rows()
 
             logger.info(f"Transcription task {task_id} completed successfully")
 
@@ -153,6 +461,8 @@ async def get_transcription_task(task_id: str):
                 message="Transcription failed",
             )
 
+    except APIException:
+        raise
     except requests.RequestException as e:
         logger.error(
             f"Request failed when querying transcription task {task_id}: {str(e)}"
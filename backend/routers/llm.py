@@ -1,13 +1,44 @@
 # -*- coding: UTF-8 -*-
 
 from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
 from openai import OpenAI
 
 import env
+from config.log import get_logger
+from constants import RequestPriority
+from core.admission import LLM_LIMITER
+from core.exceptions import APIException
 from core.response import success_response, APIResponse
 from models import ChatRequest
+from routers.transcripts import INDEX_CACHE
+from utils.retrieval import format_context
 
 router = APIRouter(prefix="/llm", tags=["LLM"])
+logger = get_logger(__name__)
+
+
+def ground_messages(messages: list, audio_md5: str, top_k: int) -> list:
+    """将转写检索结果注入到最后一条用户消息中"""
+    index = INDEX_CACHE.get(audio_md5)
+    if index is None:
+        # 索引可能因 LRU 淘汰/重启/多 worker 而缺失, 交由客户端重建索引或改用全文
+        raise APIException(
+            status_code=404,
+            message=f"Transcript index not found: {audio_md5}",
+            error_code="TRANSCRIPT_INDEX_NOT_FOUND",
+        )
+
+    for message in reversed(messages):
+        if message["role"] == "user":
+            segments = index.search(message["content"], top_k=top_k)
+            if segments:
+                message["content"] = (
+                    f"以下是视频中与问题相关的片段:\n{format_context(segments)}"
+                    f"\n\n问题: {message['content']}"
+                )
+            break
+    return messages
 
 
 @router.post("/completions", response_model=APIResponse)
@@ -22,12 +53,16 @@ async def default_chat(request: ChatRequest):
         {"role": message.role, "content": message.content}
         for message in request.messages
     ]
+    if request.audio_md5:
+        messages = ground_messages(messages, request.audio_md5, request.top_k)
 
-    response = client.chat.completions.create(
-        model=env.LLM_MODEL_ID,
-        messages=messages,
-        timeout=120,
-    )
+    async with LLM_LIMITER.slot(RequestPriority.INTERACTIVE):
+        response = await run_in_threadpool(
+            client.chat.completions.create,
+            model=env.LLM_MODEL_ID,
+            messages=messages,
+            timeout=120,
+        )
     return success_response(
         data={"choices": [choices.model_dump() for choices in response.choices]},
         message="Chat completed successfully",
@@ -47,12 +82,14 @@ async def generate_markdown_text(request: ChatRequest):
         for message in request.messages
     ]
 
-    response = client.chat.completions.create(
-        model=env.LLM_MODEL_ID,
-        messages=messages,
-        timeout=request.timeout,
-        max_tokens=request.max_tokens,
-    )
+    async with LLM_LIMITER.slot(RequestPriority.BULK):
+        response = await run_in_threadpool(
+            client.chat.completions.create,
+            model=env.LLM_MODEL_ID,
+            messages=messages,
+            timeout=request.timeout,
+            max_tokens=request.max_tokens,
+        )
 
     return success_response(
         data={"choices": [choices.model_dump() for choices in response.choices]},
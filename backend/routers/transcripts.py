@@ -0,0 +1,62 @@
+# -*- coding: UTF-8 -*-
+import time
+
+from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+
+import env
+from config.log import get_logger
+from core.exceptions import APIException
+from core.response import success_response, APIResponse
+from models import TranscriptIndexRequest, TranscriptSearchRequest
+from utils.retrieval import TranscriptIndexCache
+
+router = APIRouter(prefix="/transcripts", tags=["Transcripts"])
+logger = get_logger(__name__)
+INDEX_CACHE = TranscriptIndexCache(capacity=env.TRANSCRIPT_INDEX_CACHE_SIZE)
+
+
+@router.post("/{audio_md5}/index", response_model=APIResponse)
+async def create_transcript_index(audio_md5: str, request: TranscriptIndexRequest):
+    """为转写结果构建检索索引
+
+    RESTful路径: POST /api/v1/transcripts/{audio_md5}/index
+    """
+    start = time.perf_counter()
+    index = await run_in_threadpool(
+        INDEX_CACHE.build,
+        audio_md5,
+        [utterance.model_dump() for utterance in request.utterances],
+        window_ms=env.TRANSCRIPT_SEGMENT_WINDOW_MS,
+    )
+    elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
+
+    logger.info(
+        f"Transcript index built for {audio_md5}: "
+        f"{len(index.segments)} segments in {elapsed_ms} ms"
+    )
+
+    return success_response(
+        data={"segments": len(index.segments), "build_time_ms": elapsed_ms},
+        message="Transcript index built successfully",
+    )
+
+
+@router.post("/{audio_md5}/search", response_model=APIResponse)
+async def search_transcript(audio_md5: str, request: TranscriptSearchRequest):
+    """检索与问题相关的转写片段
+
+    RESTful路径: POST /api/v1/transcripts/{audio_md5}/search
+    """
+    index = INDEX_CACHE.get(audio_md5)
+    if index is None:
+        raise APIException(
+            status_code=404,
+            message=f"Transcript index not found: {audio_md5}",
+            error_code="TRANSCRIPT_INDEX_NOT_FOUND",
+        )
+
+    return success_response(
+        data={"segments": index.search(request.query, top_k=request.top_k)},
+        message="Transcript search completed",
+    )
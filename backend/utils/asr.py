@@ -0,0 +1,267 @@
+# -*- coding: UTF-8 -*-
+import base64
+import codecs
+import hashlib
+import hmac
+import json
+import re
+from array import array
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import env
+
+_WHITESPACE = " \t\n\r"
+# 分片转写任务的组合任务ID前缀
+CHUNKED_TASK_PREFIX = "chunked."
+_DECODER = json.JSONDecoder()
+# 字符串内部: 普通字符或完整的转义序列, 遇到引号/缓冲区末尾的单个反斜杠即停止
+_STRING_BODY = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*', re.DOTALL)
+# 字符串外部: 影响嵌套层级的字符
+_STRUCTURAL = re.compile(r'["{}\[\]]')
+# 标量(数字/true/false/null)的结束位置
+_SCALAR_END = re.compile(r"[,}\]\s]")
+
+
+class UtteranceList:
+    """紧凑的转写句子列表
+
+    start_time/end_time 使用 array 连续存储, 文本单独存放在列表中,
+    避免为每一句转写创建一个 dict.
+    """
+
+    __slots__ = ("start_times", "end_times", "texts")
+
+    def __init__(self):
+        self.start_times = array("q")
+        self.end_times = array("q")
+        self.texts: List[str] = []
+
+    def append(self, start_time: int, end_time: int, text: str) -> None:
+        self.start_times.append(start_time)
+        self.end_times.append(end_time)
+        self.texts.append(text)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def __iter__(self) -> Iterator[Tuple[int, int, str]]:
+        return zip(self.start_times, self.end_times, self.texts)
+
+    def extend(self, other: "UtteranceList", offset_ms: int = 0) -> None:
+        """追加另一个分片的转写结果, 并将其时间戳平移 offset_ms"""
+        self.start_times.extend(start + offset_ms for start in other.start_times)
+        self.end_times.extend(end + offset_ms for end in other.end_times)
+        self.texts.extend(other.texts)
+
+    def to_rows(self) -> List[dict]:
+        """按行输出: [{"start_time", "end_time", "text"}, ...]"""
+        return [
+            {"start_time": start_time, "end_time": end_time, "text": text}
+            for start_time, end_time, text in self
+        ]
+
+    def to_columns(self) -> dict:
+        """按列输出: {"start_time": [...], "end_time": [...], "text": [...]}"""
+        return {
+            "start_time": self.start_times.tolist(),
+            "end_time": self.end_times.tolist(),
+            "text": self.texts,
+        }
+
+
+class _JSONStream:
+    """在分块到达的 JSON 文本上逐个解析值, 只在内存中保留尚未消费的部分"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        if self._pos:
+            self._buf = self._buf[self._pos :]
+            self._pos = 0
+        for chunk in self._chunks:
+            if chunk:
+                self._buf += self._decoder.decode(chunk)
+                return True
+        self._buf += self._decoder.decode(b"", final=True)
+        self._eof = True
+        return False
+
+    def peek(self) -> str:
+        """跳过空白并返回下一个非空白字符"""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON stream")
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at position {self._pos}")
+        self._pos += 1
+
+    def value(self):
+        """解析一个完整的 JSON 值, 数据不完整时继续读取"""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # 数字可能恰好被分块截断, 需确认其后还有分隔符
+            if end == len(self._buf) and not self._eof and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def skip(self) -> None:
+        """跳过一个 JSON 值而不解码, 已扫描的内容随读随丢, 耗时与值的长度成线性关系"""
+        first = self.peek()
+        if first not in '"{[':
+            while True:
+                match = _SCALAR_END.search(self._buf, self._pos)
+                if match:
+                    self._pos = match.start()
+                    return
+                if not self._fill():
+                    self._pos = len(self._buf)
+                    return
+
+        depth = 0
+        in_string = False
+        while True:
+            if in_string:
+                self._pos = _STRING_BODY.match(self._buf, self._pos).end()
+                if self._pos < len(self._buf) and self._buf[self._pos] == '"':
+                    self._pos += 1
+                    in_string = False
+                    if not depth:
+                        return
+                    continue
+            else:
+                match = _STRUCTURAL.search(self._buf, self._pos)
+                if match:
+                    self._pos = match.end()
+                    char = match.group()
+                    if char == '"':
+                        in_string = True
+                    elif char in "{[":
+                        depth += 1
+                    else:
+                        depth -= 1
+                        if not depth:
+                            return
+                    continue
+                self._pos = len(self._buf)
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON stream")
+
+    def members(self) -> Iterator[str]:
+        """遍历对象的键, 调用方负责消费每个键对应的值"""
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.peek() == ",":
+                self._pos += 1
+                continue
+            self.expect("}")
+            return
+
+    def items(self) -> Iterator[None]:
+        """遍历数组元素, 调用方负责消费每个元素"""
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield
+            if self.peek() == ",":
+                self._pos += 1
+                continue
+            self.expect("]")
+            return
+
+
+def parse_auc_query_response(
+    chunks: Iterable[bytes],
+) -> Tuple[Optional[int], Optional[str], Optional[UtteranceList]]:
+    """增量解析 AUC 查询接口的响应
+
+    只保留 resp.code / resp.message 以及每句的 start_time/end_time/text,
+    resp.text 等其他字段直接跳过不解码, words 等句内字段解析后立即丢弃.
+
+    :return: (code, message, utterances)
+    """
+    stream = _JSONStream(chunks)
+    code = message = utterances = None
+
+    for key in stream.members():
+        if key != "resp" or stream.peek() != "{":
+            stream.skip()
+            continue
+        for resp_key in stream.members():
+            if resp_key == "code":
+                code = stream.value()
+            elif resp_key == "message":
+                message = stream.value()
+            elif resp_key == "utterances" and stream.peek() == "[":
+                utterances = UtteranceList()
+                for _ in stream.items():
+                    utterance = stream.value()
+                    utterances.append(
+                        utterance["start_time"],
+                        utterance["end_time"],
+                        utterance["text"],
+                    )
+            else:
+                stream.skip()
+
+    return code, message, utterances
+
+
+def _sign(payload: str) -> str:
+    digest = hmac.new(
+        (env.TASK_ID_SECRET or "").encode("utf-8"),
+        payload.encode("utf-8"),
+        hashlib.sha256,
+    ).digest()
+    return base64.urlsafe_b64encode(digest).decode().rstrip("=")
+
+
+def encode_chunked_task_id(tasks: List[Tuple[str, int, str]]) -> str:
+    """将各分片的 (任务ID, 起始时间, 分片文件名) 编码为一个组合任务ID
+
+    服务端无需保存状态, 组合任务ID带有 HMAC 签名, 防止客户端篡改分片文件名
+    """
+    payload = json.dumps(tasks, separators=(",", ":")).encode("utf-8")
+    encoded = base64.urlsafe_b64encode(payload).decode().rstrip("=")
+    return f"{CHUNKED_TASK_PREFIX}{encoded}.{_sign(encoded)}"
+
+
+def decode_chunked_task_id(task_id: str) -> Optional[List[Tuple[str, int, str]]]:
+    """解析组合任务ID, 普通任务ID返回 None, 签名或格式不正确时抛出 ValueError"""
+    if not task_id.startswith(CHUNKED_TASK_PREFIX):
+        return None
+    encoded, _, signature = task_id[len(CHUNKED_TASK_PREFIX) :].rpartition(".")
+    if not encoded or not hmac.compare_digest(signature, _sign(encoded)):
+        raise ValueError("invalid chunked task id signature")
+    payload = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+    return [
+        (chunk_task_id, offset_ms, part_name)
+        for chunk_task_id, offset_ms, part_name in json.loads(payload)
+    ]
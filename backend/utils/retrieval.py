@@ -0,0 +1,153 @@
+# -*- coding: UTF-8 -*-
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional
+
+# CJK 统一表意文字/扩展A/日文假名/韩文音节按字切分, 其余按单词切分
+_TOKEN_PATTERN = re.compile(
+    r"[\u3400-\u4dbf\u4e00-\u9fff\u3040-\u30ff\uac00-\ud7af]+|[a-z0-9]+"
+)
+_CJK_PATTERN = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\u3040-\u30ff\uac00-\ud7af]")
+
+
+def tokenize(text: str) -> List[str]:
+    """分词: CJK 文本输出单字 + 相邻二元组, 其他文本输出小写单词"""
+    tokens = []
+    for run in _TOKEN_PATTERN.findall(text.lower()):
+        if _CJK_PATTERN.match(run):
+            tokens.extend(run)
+            tokens.extend(run[i : i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+def build_segments(utterances: List[dict], window_ms: int = 30000) -> List[dict]:
+    """将相邻的句子按时间窗口合并为检索片段"""
+    segments = []
+    texts = []
+    start_time = end_time = None
+
+    for utterance in utterances:
+        if start_time is None:
+            start_time = utterance["start_time"]
+        elif utterance["end_time"] - start_time > window_ms:
+            segments.append(
+                {
+                    "start_time": start_time,
+                    "end_time": end_time,
+                    "text": " ".join(texts),
+                }
+            )
+            texts = []
+            start_time = utterance["start_time"]
+        texts.append(utterance["text"])
+        end_time = utterance["end_time"]
+
+    if texts:
+        segments.append(
+            {"start_time": start_time, "end_time": end_time, "text": " ".join(texts)}
+        )
+    return segments
+
+
+class BM25Index:
+    """基于 BM25 的转写片段检索索引"""
+
+    def __init__(self, segments: List[dict], k1: float = 1.5, b: float = 0.75):
+        self.segments = segments
+        self.k1 = k1
+        self.b = b
+
+        # 倒排表: token -> [(片段下标, 词频), ...]
+        self.postings: Dict[str, List[tuple]] = {}
+        self.doc_lengths: List[int] = []
+        for doc_id, segment in enumerate(segments):
+            counts = Counter(tokenize(segment["text"]))
+            self.doc_lengths.append(sum(counts.values()))
+            for token, tf in counts.items():
+                self.postings.setdefault(token, []).append((doc_id, tf))
+
+        n = len(segments)
+        self.avg_doc_length = (sum(self.doc_lengths) / n) if n else 0.0
+        self.idf = {
+            token: math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for token, docs in self.postings.items()
+        }
+        # 预先计算每个片段的长度归一化项, 查询时无需重复计算
+        # 所有片段都没有可检索的词时 avg_doc_length 为 0, 此时没有倒排表, 也无需归一化
+        self.norms = (
+            [
+                k1 * (1 - b + b * length / self.avg_doc_length)
+                for length in self.doc_lengths
+            ]
+            if self.avg_doc_length
+            else []
+        )
+
+    def search(self, query: str, top_k: int = 5) -> List[dict]:
+        """检索与问题最相关的 top_k 个片段, 结果按时间顺序返回"""
+        if not self.segments or not self.avg_doc_length:
+            return []
+
+        scores: Dict[int, float] = {}
+        for token in set(tokenize(query)):
+            idf = self.idf.get(token)
+            if idf is None:
+                continue
+            for doc_id, tf in self.postings[token]:
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (
+                    tf + self.norms[doc_id]
+                )
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+        return [
+            dict(self.segments[doc_id], score=round(score, 4))
+            for doc_id, score in sorted(ranked)
+        ]
+
+
+class TranscriptIndexCache:
+    """按音频 md5 缓存的 LRU 索引缓存"""
+
+    def __init__(self, capacity: int = 32):
+        self.capacity = capacity
+        self._indexes: "OrderedDict[str, BM25Index]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, audio_md5: str) -> Optional[BM25Index]:
+        with self._lock:
+            index = self._indexes.get(audio_md5)
+            if index is not None:
+                self._indexes.move_to_end(audio_md5)
+            return index
+
+    def put(self, audio_md5: str, index: BM25Index) -> None:
+        with self._lock:
+            self._indexes[audio_md5] = index
+            self._indexes.move_to_end(audio_md5)
+            while len(self._indexes) > self.capacity:
+                self._indexes.popitem(last=False)
+
+    def build(
+        self, audio_md5: str, utterances: List[dict], window_ms: int = 30000
+    ) -> BM25Index:
+        """构建索引并写入缓存"""
+        index = BM25Index(build_segments(utterances, window_ms=window_ms))
+        self.put(audio_md5, index)
+        return index
+
+
+def format_context(segments: List[dict]) -> str:
+    """将检索到的片段格式化为带时间戳的上下文文本"""
+
+    def _ts(ms: int) -> str:
+        seconds = ms // 1000
+        return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+    return "\n".join(
+        f"[{_ts(segment['start_time'])} - {_ts(segment['end_time'])}] {segment['text']}"
+        for segment in segments
+    )
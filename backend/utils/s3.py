@@ -1,4 +1,6 @@
 # -*- coding: UTF-8 -*-
+from typing import List
+
 import boto3
 from botocore.client import Config
 
@@ -48,3 +50,50 @@ def generate_upload_url(file_name: str):
         Params={"Bucket": env.STORAGE_BUCKET, "Key": file_name},
         ExpiresIn=3600,
     )
+
+
+def head_file_size(file_name: str) -> int:
+    """获取文件大小, 不下载文件内容 (使用 S3 兼容协议)"""
+    s3_client = get_s3_client()
+
+    return s3_client.head_object(Bucket=env.STORAGE_BUCKET, Key=file_name)[
+        "ContentLength"
+    ]
+
+
+def read_file_range(file_name: str, start: int, length: int) -> bytes:
+    """读取文件中的一段内容 (使用 S3 兼容协议)"""
+    s3_client = get_s3_client()
+
+    response = s3_client.get_object(
+        Bucket=env.STORAGE_BUCKET,
+        Key=file_name,
+        Range=f"bytes={start}-{start + length - 1}",
+    )
+    return response["Body"].read()
+
+
+def download_file(file_name: str, fileobj):
+    """下载文件内容到文件对象 (使用 S3 兼容协议)"""
+    s3_client = get_s3_client()
+
+    s3_client.download_fileobj(env.STORAGE_BUCKET, file_name, fileobj)
+
+
+def upload_bytes(file_name: str, data: bytes):
+    """上传二进制内容 (使用 S3 兼容协议)"""
+    s3_client = get_s3_client()
+
+    s3_client.put_object(
+        Bucket=env.STORAGE_BUCKET, Key=file_name, Body=data, ContentType="audio/mpeg"
+    )
+
+
+def delete_files(file_names: List[str]):
+    """批量删除文件 (使用 S3 兼容协议)"""
+    s3_client = get_s3_client()
+
+    s3_client.delete_objects(
+        Bucket=env.STORAGE_BUCKET,
+        Delete={"Objects": [{"Key": name} for name in file_names], "Quiet": True},
+    )
@@ -0,0 +1,297 @@
+# -*- coding: UTF-8 -*-
+from array import array
+from typing import List, Optional, Tuple
+
+# MPEG 版本: 3 = MPEG1, 2 = MPEG2, 0 = MPEG2.5
+_MPEG1 = 3
+_BITRATES = {
+    _MPEG1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_SAMPLE_RATES = {
+    _MPEG1: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    0: (11025, 12000, 8000),
+}
+
+
+class Mp3Frames:
+    """MP3 (MPEG Layer III) 帧索引
+
+    不解码音频, 只解析帧头和 side info, 记录每一帧在文件中的位置以及
+    global_gain (量化步长, 每级约 1.5 dB) 作为该帧能量的近似值.
+    """
+
+    __slots__ = ("offsets", "lengths", "gains", "frame_ms")
+
+    def __init__(self):
+        self.offsets = array("q")
+        self.lengths = array("l")
+        self.gains = array("h")
+        self.frame_ms = 0.0
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    @property
+    def duration_ms(self) -> int:
+        return int(len(self) * self.frame_ms)
+
+
+def _parse_header(data: bytes, pos: int) -> Optional[Tuple[int, int, int, int]]:
+    """解析帧头, 返回 (帧长度, 每帧采样数, 采样率, side info 起始偏移)"""
+    if pos + 4 > len(data) or data[pos] != 0xFF or data[pos + 1] & 0xE0 != 0xE0:
+        return None
+    b1, b2 = data[pos + 1], data[pos + 2]
+    version = (b1 >> 3) & 0x3
+    layer = (b1 >> 1) & 0x3
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 0x3
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    bitrate = _BITRATES[_MPEG1 if version == _MPEG1 else 2][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version][sample_rate_index]
+    padding = (b2 >> 1) & 0x1
+    if version == _MPEG1:
+        samples, length = 1152, 144 * bitrate // sample_rate + padding
+    else:
+        samples, length = 576, 72 * bitrate // sample_rate + padding
+    side_info = pos + 4 + (0 if b1 & 0x1 else 2)
+    return length, samples, sample_rate, side_info
+
+
+def _frame_gain(data: bytes, pos: int, side_info: int) -> int:
+    """读取各 granule/声道中最大的 global_gain, 没有编码数据的 granule 视为静音"""
+    version = (data[pos + 1] >> 3) & 0x3
+    channels = 1 if data[pos + 3] >> 6 == 3 else 2
+    if version == _MPEG1:
+        bit = 9 + (5 if channels == 1 else 3) + 4 * channels
+        granules, stride = 2, 59
+    else:
+        bit = 8 + (1 if channels == 1 else 2)
+        granules, stride = 1, 63
+
+    value = int.from_bytes(data[side_info : side_info + 32], "big")
+    total_bits = len(data[side_info : side_info + 32]) * 8
+    gain = 0
+    for _ in range(granules * channels):
+        if bit + 29 > total_bits:
+            break
+        part2_3_length = (value >> (total_bits - bit - 12)) & 0xFFF
+        if part2_3_length:
+            gain = max(gain, (value >> (total_bits - bit - 29)) & 0xFF)
+        bit += stride
+    return gain
+
+
+def id3_size(data: bytes) -> int:
+    """ID3v2 标签的长度, 即第一个音频帧之前需要跳过的字节数"""
+    if data[:3] != b"ID3" or len(data) < 10:
+        return 0
+    size = 0
+    for byte in data[6:10]:
+        size = (size << 7) | (byte & 0x7F)
+    return 10 + size + (10 if data[5] & 0x10 else 0)
+
+
+def scan_mp3_frames(data: bytes) -> Mp3Frames:
+    """扫描 MP3 数据中的所有音频帧"""
+    frames = Mp3Frames()
+    pos = id3_size(data)
+    first = True
+    while pos + 4 <= len(data):
+        header = _parse_header(data, pos)
+        # 防止误同步: 要求下一帧紧接着也是合法帧头(文件末尾除外)
+        if header is None or (
+            pos + header[0] < len(data) and _parse_header(data, pos + header[0]) is None
+        ):
+            pos += 1
+            continue
+
+        length, samples, sample_rate, side_info = header
+        if first:
+            first = False
+            frames.frame_ms = samples * 1000 / sample_rate
+            # 跳过 Xing/Info/VBRI 头帧, 它只描述整个文件, 切分后不再适用
+            if any(
+                tag in data[pos : pos + length] for tag in (b"Xing", b"Info", b"VBRI")
+            ):
+                pos += length
+                continue
+
+        frames.offsets.append(pos)
+        frames.lengths.append(length)
+        frames.gains.append(_frame_gain(data, pos, side_info))
+        pos += length
+    return frames
+
+
+def estimate_duration_ms(data: bytes, audio_size: int) -> Optional[int]:
+    """根据音频开头的少量数据估算时长, 无需下载完整文件
+
+    data 为 ID3 标签之后的开头部分, audio_size 为标签之后的音频总字节数.
+    VBR 文件读取 Xing/Info/VBRI 头中的总帧数, 否则按平均帧长度估算.
+    找不到合法帧时返回 None.
+    """
+    pos = 0
+    while pos + 4 <= len(data):
+        header = _parse_header(data, pos)
+        if header is None or (
+            pos + header[0] + 4 <= len(data)
+            and _parse_header(data, pos + header[0]) is None
+        ):
+            pos += 1
+            continue
+
+        length, samples, sample_rate, _ = header
+        frame_ms = samples * 1000 / sample_rate
+        audio_size -= pos
+        frame = data[pos : pos + length]
+        # Xing/Info: 标签后 4 字节 flags, flags 最低位表示其后 4 字节为总帧数
+        # VBRI: 标签后依次为 version/delay/quality(各 2 字节)/总字节数(4 字节)/总帧数
+        for tag, frames_at in ((b"Xing", 8), (b"Info", 8), (b"VBRI", 14)):
+            index = frame.find(tag)
+            if index < 0:
+                continue
+            if tag != b"VBRI" and not frame[index + 7] & 0x1:
+                break
+            count = int.from_bytes(
+                frame[index + frames_at : index + frames_at + 4], "big"
+            )
+            if count:
+                return int(count * frame_ms)
+            break
+        # 没有 VBR 头时按已读取部分的平均帧长度估算, 对 CBR 是精确值
+        count, total = 0, 0
+        while pos + 4 <= len(data):
+            header = _parse_header(data, pos)
+            if header is None:
+                break
+            count += 1
+            total += header[0]
+            pos += header[0]
+        return int(audio_size / (total / count) * frame_ms)
+    return None
+
+
+def detect_silences(
+    frames: Mp3Frames, min_silence_ms: int = 500
+) -> List[Tuple[int, int]]:
+    """基于能量的静音检测, 返回静音区间的帧下标 [start, end)
+
+    阈值取能量分布中噪声底(10% 分位)与语音电平(90% 分位)的中点,
+    两者差距不足 12 dB 时认为无法可靠区分, 不返回任何静音区间.
+    """
+    if not len(frames):
+        return []
+    ordered = sorted(frames.gains)
+    floor = ordered[len(ordered) // 10]
+    peak = ordered[len(ordered) * 9 // 10]
+    if peak - floor < 8:
+        return []
+    threshold = (floor + peak) / 2
+    min_frames = max(1, int(min_silence_ms / frames.frame_ms))
+
+    silences = []
+    start = None
+    for index, gain in enumerate(frames.gains):
+        if gain < threshold:
+            if start is None:
+                start = index
+        elif start is not None:
+            if index - start >= min_frames:
+                silences.append((start, index))
+            start = None
+    if start is not None and len(frames) - start >= min_frames:
+        silences.append((start, len(frames)))
+    return silences
+
+
+def plan_chunks(
+    frames: Mp3Frames,
+    silences: List[Tuple[int, int]],
+    target_ms: int,
+    max_ms: int,
+    max_chunks: Optional[int] = None,
+    drop_silence_ms: int = 5000,
+    pad_ms: int = 200,
+) -> List[Tuple[int, int]]:
+    """在静音处切分音频, 返回每个分片的帧下标 [start, end)
+
+    - 分片时长达到 target_ms 后在下一个静音处切分
+    - 只裁掉首尾静音, 以及切分点处超过 drop_silence_ms 的长静音(两侧保留 pad_ms),
+      分片内部的静音原样保留, 保证分片内的时间轴与原音频一致
+    - 一直找不到静音时按 max_ms 强制切分
+    - 分片数超过 max_chunks 时合并相邻且合计最短的两个分片, 直到不超过上限
+    """
+    total = len(frames)
+    frame_ms = frames.frame_ms
+    target = int(target_ms / frame_ms)
+    max_frames = max(1, int(max_ms / frame_ms))
+    drop = int(drop_silence_ms / frame_ms)
+    pad = int(pad_ms / frame_ms)
+
+    chunks = []
+    start = 0
+    end = total
+    if silences and silences[0][0] == 0:
+        start = max(0, silences[0][1] - pad)
+    if silences and silences[-1][1] == total:
+        end = min(total, silences[-1][0] + pad)
+
+    def cut(silence_start: int, silence_end: int) -> int:
+        if silence_end - silence_start >= drop:
+            chunks.append((start, silence_start + pad))
+            return silence_end - pad
+        middle = (silence_start + silence_end) // 2
+        chunks.append((start, middle))
+        return middle
+
+    def fit(limit: int, candidate: Optional[Tuple[int, int]]) -> int:
+        # 超过 max_ms 时优先退回到上一个静音处切分, 没有静音再强制切分
+        new_start = start
+        if limit - new_start > max_frames and candidate:
+            new_start = cut(*candidate)
+        while limit - new_start > max_frames:
+            chunks.append((new_start, new_start + max_frames))
+            new_start += max_frames
+        return new_start
+
+    candidate = None
+    for silence_start, silence_end in silences:
+        if silence_start <= start or silence_end >= end:
+            continue
+        if silence_start - start > max_frames:
+            start, candidate = fit(silence_start, candidate), None
+
+        if silence_start - start >= target:
+            start, candidate = cut(silence_start, silence_end), None
+        else:
+            candidate = (silence_start, silence_end)
+
+    start = fit(end, candidate)
+    if end > start:
+        chunks.append((start, end))
+
+    # 合并后的分片覆盖两者之间被裁掉的静音, 起始时间不变, 时间轴仍然正确
+    while max_chunks and len(chunks) > max_chunks:
+        index = min(
+            range(len(chunks) - 1),
+            key=lambda i: chunks[i + 1][1] - chunks[i][0],
+        )
+        chunks[index : index + 2] = [(chunks[index][0], chunks[index + 1][1])]
+    return chunks
+
+
+def chunk_bytes(data: bytes, frames: Mp3Frames, chunk: Tuple[int, int]) -> bytes:
+    """取出分片对应的原始 MP3 数据, 帧可直接拼接无需重新编码"""
+    start, end = chunk
+    return data[
+        frames.offsets[start] : frames.offsets[end - 1] + frames.lengths[end - 1]
+    ]
+
+
+def chunk_offset_ms(frames: Mp3Frames, chunk: Tuple[int, int]) -> int:
+    """分片在原始音频中的起始时间"""
+    return round(chunk[0] * frames.frame_ms)
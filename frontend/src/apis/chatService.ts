@@ -1,12 +1,33 @@
 import httpService from './http'
-import { ChatMessage, APIResponse, ChatResponse } from './types'
+import { ChatMessage, APIResponse, ChatResponse, TranscriptIndexResponse } from './types'
+
+/**
+ * 为转写结果构建检索索引
+ * @param audioMd5 音频MD5
+ * @param utterances 转写句子列表
+ */
+export const buildTranscriptIndex = async (
+  audioMd5: string,
+  utterances: Array<{ start_time: number; end_time: number; text: string }>
+): Promise<void> => {
+  const response = await httpService.request<APIResponse<TranscriptIndexResponse>>({
+    url: `/api/v1/transcripts/${audioMd5}/index`,
+    method: 'POST',
+    data: { utterances }
+  })
+
+  if (!response.success) {
+    throw new Error(response.error?.message || '构建转写索引失败')
+  }
+}
 
 /**
  * 发送聊天消息
  * @param messages 聊天消息列表
+ * @param audioMd5 音频MD5，传入时后端会检索相关片段注入到问题中
  * @returns 助手响应消息
  */
-export const sendChatMessage = async (messages: ChatMessage[]): Promise<ChatMessage> => {
+export const sendChatMessage = async (messages: ChatMessage[], audioMd5?: string): Promise<ChatMessage> => {
   try {
     const response = await httpService.request<APIResponse<ChatResponse>>({
       url: '/api/v1/llm/completions', // 新的RESTful路径
@@ -15,7 +36,10 @@ export const sendChatMessage = async (messages: ChatMessage[]): Promise<ChatMess
         messages,
         max_tokens: 8192,
         timeout: 120,
-      }
+        audio_md5: audioMd5,
+      },
+      // 索引缺失由调用方重建索引后重试，不弹出错误提示
+      silentErrorCodes: audioMd5 ? ['TRANSCRIPT_INDEX_NOT_FOUND'] : undefined
     })
     
     if (!response.success) {
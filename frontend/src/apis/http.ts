@@ -3,6 +3,23 @@ import { ElMessage } from 'element-plus'
 import { API_BASE_URL } from '../config'
 import { APIResponse } from './types'
 
+declare module 'axios' {
+  interface AxiosRequestConfig {
+    /**
+     * 由调用方自行处理的业务错误码，出现时不弹出错误提示
+     */
+    silentErrorCodes?: string[]
+  }
+}
+
+/**
+ * 错误码是否由调用方自行处理
+ */
+const isSilentError = (config: AxiosRequestConfig | undefined, data: any): boolean => {
+  const code = data?.error?.code
+  return !!code && !!config?.silentErrorCodes?.includes(code)
+}
+
 /**
  * 统一的API请求错误
  */
@@ -61,7 +78,9 @@ class HttpService {
         if (data && typeof data === 'object' && 'success' in data && !data.success) {
           const message = data.error?.message || '请求失败'
           console.error('API业务错误:', message, data.error)
-          ElMessage.error(message)
+          if (!isSilentError(response.config, data)) {
+            ElMessage.error(message)
+          }
           throw new ApiError(message, response.status, data)
         }
         
@@ -95,7 +114,9 @@ class HttpService {
         }
         
         console.error(`API错误 [${status}]:`, message, data)
-        ElMessage.error(message)
+        if (!isSilentError(error.config, data)) {
+          ElMessage.error(message)
+        }
         
         return Promise.reject(new ApiError(message, status, data))
       }
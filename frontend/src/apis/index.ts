@@ -10,7 +10,7 @@ import httpService from './http'
 export const { submitAsrTask, pollAsrTask: pollAudioTask, queryAsrTask } = audioService
 export const { generateMarkdownText } = markdownService
 export const { getAudioUploadUrl, uploadFile } = uploadService
-export const { sendChatMessage } = chatService
+export const { sendChatMessage, buildTranscriptIndex } = chatService
 export const { checkHealth } = healthService
 export const { getSecrets } = secretsService // 新增
 
@@ -43,6 +43,14 @@ export interface ChatMessage {
   content: string;
 }
 
+/**
+ * 转写索引构建响应
+ */
+export interface TranscriptIndexResponse {
+  segments: number;
+  build_time_ms: number;
+}
+
 /**
  * 文件上传URL响应
  */